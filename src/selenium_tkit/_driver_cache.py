@@ -0,0 +1,44 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# até 4 resolves em paralelo: no warm-up de um pool os stalls de rede/disco
+# dos vários drivers se sobrepõem ao invés de serializar
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="driver-resolve")
+
+# --------------------------------------------------
+
+@lru_cache(maxsize=None)
+def resolve_driver(manager_cls, driver_path: str) -> str:
+    """Resolve (e baixa se necessário) o binário do driver via webdriver_manager
+
+    O `install()` faz um check de versão por HTTP + I/O de disco a cada chamada;
+    memoizado por `(manager, path)`, o segundo driver da mesma run resolve na hora
+    ---
+    Parameters
+    ------
+    `manager_cls` : type
+        Classe do webdriver_manager (ex: GeckoDriverManager, EdgeChromiumDriverManager)
+    `driver_path` : str
+        Pasta onde o driver fica/será baixado
+
+    Returns
+    ------
+    `driver` : str
+        Caminho do executável do driver
+    """
+    driver = manager_cls(path=driver_path).install()
+    logger.debug(f"Driver resolvido: '{driver}'")
+    return driver
+
+
+def resolve_driver_async(manager_cls, driver_path: str) -> Future:
+    """Agenda o `resolve_driver` numa thread do executor e retorna o Future
+
+    O `__init__` das classes guarda o future e o `begin()` só bloqueia no
+    `.result()` quando vai realmente usar o driver, tirando o round-trip de
+    rede do caminho de construção
+    """
+    return _EXECUTOR.submit(resolve_driver, manager_cls, driver_path)
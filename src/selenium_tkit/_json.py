@@ -0,0 +1,47 @@
+import json
+import os
+from pathlib import Path
+from typing import Union
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional, sem ele usa o json da stdlib
+    orjson = None
+
+# --------------------------------------------------
+
+def load_json_file(path: Union[Path, str]) -> dict:
+    """Loads `path` as json in a single read
+
+    Missing, empty or corrupted files become an empty dict, so callers don't need
+    an exists/create round-trip before reading
+    """
+    try:
+        raw = Path(path).read_bytes()
+    except FileNotFoundError:
+        return dict()
+
+    if not raw:
+        return dict()
+
+    try:
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+    except ValueError:  # JSONDecodeError (stdlib e orjson) herda de ValueError
+        return dict()
+
+
+def dump_json_file(path: Union[Path, str], data: dict) -> None:
+    """Dumps `data` as json to `path` atomically (temp file + os.replace), avoiding partial writes"""
+    path = Path(path)
+
+    if orjson is not None:
+        raw = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        raw = json.dumps(data, indent=4).encode("utf-8")
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, path)
+    return
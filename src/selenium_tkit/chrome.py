@@ -1,12 +1,18 @@
-import json
+import base64
 import logging
 import os
+import random
 import re
+import socket
+import sys
+import time
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from subprocess import CREATE_NEW_CONSOLE, CREATE_NO_WINDOW, Popen
+from subprocess import DEVNULL, Popen, run
 from typing import Optional, Union
 
-import psutil
+from retimer import Timer
 from selenium.common.exceptions import (InvalidSessionIdException,
                                         SessionNotCreatedException,
                                         WebDriverException)
@@ -14,17 +20,138 @@ from selenium.webdriver import Chrome
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.remote.webdriver import WebDriver
-from undetected_chromedriver.patcher import Patcher
 from urllib3.exceptions import MaxRetryError
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.driver_cache import DriverCacheManager
 
+from ._json import dump_json_file, load_json_file
 from .custom_webdriver import CustomWebDriver
 
+# as flags de console só existem no subprocess do Windows; em POSIX o valor 0
+# (default de creationflags) mantém os call sites iguais sem quebrar o import
+if sys.platform == "win32":
+    from subprocess import CREATE_NEW_CONSOLE, CREATE_NO_WINDOW
+else:
+    CREATE_NEW_CONSOLE = CREATE_NO_WINDOW = 0
+
 # --------------------------------------------------
 
 logger = logging.getLogger(__name__)
 
+# one-time: baixa o ruído do selenium/urllib3 uma vez no import, ao invés de
+# cada create_*() repagar o lock + lookup do logging a cada chamada
+logging.getLogger("selenium").setLevel(logging.WARNING)
+logging.getLogger("urllib3").setLevel(logging.WARNING)
+
+# mensagem do SessionNotCreatedException quando o chrome está desatualizado
+_VERSION_RE = re.compile(r"version is (.*) with binary")
+
+# imagens exatas dos processos do chrome, pra não matar processos parecidos por engano (ex: chrome_sandbox)
+CHROME_IMAGE_NAMES = frozenset({"chrome.exe", "chromedriver.exe"})
+
+# --------------------------------------------------
+
+def _any_image_running(images: frozenset) -> bool:
+    """Verifica se alguma das `images` está em execução
+
+    Windows: um único snapshot do tasklist ao invés do psutil construir um objeto Process por PID.
+    POSIX: process_iter(['name']) preenche o cache .info num passe só, sem um name() avulso por processo
+    """
+    if sys.platform != "win32":
+        import psutil  # lazy, só este probe usa
+
+        bare = {name[:-4] if name.endswith(".exe") else name for name in images}
+        return any((p.info['name'] or "") in bare for p in psutil.process_iter(['name']))
+
+    result = run(["tasklist", "/NH", "/FO", "CSV"], capture_output=True, creationflags=CREATE_NO_WINDOW)
+    for line in result.stdout.splitlines():
+        name = line.split(b'","')[0].strip(b'"').decode("utf-8", "ignore")
+        if name in images:
+            return True
+    return False
+
+
+def _patch_driver(driver_path: str) -> str:
+    """Aplica o patch do undetected_chromedriver no binário, pulando quando ele já foi aplicado
+
+    O `Patcher().auto()` lê e reescreve o chromedriver inteiro (15~30 MB) a cada chamada;
+    um sidecar '.patched' com mtime+tamanho do binário registra que o trabalho já foi feito
+    """
+    exe = Path(driver_path)
+    sidecar = exe.with_suffix(".patched")
+
+    stat = exe.stat()
+    stamp = f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    cached = load_json_file(sidecar)
+    if cached.get("stamp") == stamp and os.path.exists(cached.get("executable_path", "")):
+        return cached["executable_path"]
+
+    # lazy, o undetected_chromedriver puxa uma cadeia de imports bem pesada
+    from undetected_chromedriver.patcher import Patcher
+
+    patcher = Patcher(executable_path=driver_path, force=False)
+    patcher.auto()
+
+    dump_json_file(sidecar, {"stamp": stamp, "executable_path": patcher.executable_path})
+    return patcher.executable_path
+
+
+@lru_cache(maxsize=32)
+def _encode_extension(path: str, mtime_ns: int) -> str:
+    """Base64 do arquivo .crx, memoizado por (path, mtime)
+
+    Montar as options de novo pra cada driver não precisa reler as extensões do disco
+    """
+    return base64.b64encode(Path(path).read_bytes()).decode("utf-8")
+
+
+@contextmanager
+def _file_lock(lock_path: Union[Path, str]):
+    """Exclusive cross-process lock
+
+    Two scripts starting at the same time could both read id.json, both see no chrome
+    and both spawn a chromedriver on the same port — the lock serializes the whole
+    read/spawn/attach/save sequence
+    """
+    with open(lock_path, "w") as lock_file:
+        if sys.platform == "win32":
+            import msvcrt
+            # LK_LOCK desiste (OSError) após 10 tentativas de 1s, mas o dono do lock
+            # segura ele pelo kill + spawn + attach inteiro — pode passar fácil de 10s.
+            # insiste até conseguir, igual ao flock bloqueante do branch POSIX
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@lru_cache(maxsize=8)
+def _resolve_driver(driver_path: str) -> str:
+    """Resolves (downloads or locates) the chromedriver binary for `driver_path`
+
+    `install()` probes the installed chrome version (and possibly the network) on every call,
+    so the resolved path is memoized per `driver_path`
+    """
+    # lazy, o import do webdriver_manager é pesado e só é necessário aqui
+    from webdriver_manager.chrome import ChromeDriverManager
+    from webdriver_manager.core.driver_cache import DriverCacheManager
+
+    cache = DriverCacheManager(driver_path)
+    return ChromeDriverManager(cache_manager=cache).install()
+
 # --------------------------------------------------
 
 class ReusableChrome(CustomWebDriver):
@@ -82,16 +209,12 @@ class ReusableChrome(CustomWebDriver):
 
         if isinstance(driver_path, Path):
             driver_path = str(driver_path)
-            cache = DriverCacheManager(driver_path)
-        self.driver_path = ChromeDriverManager(cache_manager=cache).install()
+        self.driver_path = _resolve_driver(driver_path)
 
         if apply_patch:
-            patcher = Patcher(executable_path=self.driver_path, force=False)
-            patcher.auto()
-
-            self.driver_path = patcher.executable_path
+            self.driver_path = _patch_driver(self.driver_path)
 
-        self.id_path = id_path
+        self.id_path = Path(id_path)  # normaliza uma vez, begin() sempre trabalha com Path
         self.implicity_wait = implicity_wait
         self.port = port
         self.options = options
@@ -102,24 +225,47 @@ class ReusableChrome(CustomWebDriver):
 
     @property
     def any_chrome_process_exists(self):
-        for p in psutil.process_iter():
-            if "chromedriver.exe" in p.name():
-                return True
-        else:
-            return False
+        import psutil
+
+        # com o pid do chromedriver rastreado, checar o status da instância
+        # psutil.Process cacheada é O(1) ao invés de consultar o SO
+        proc = getattr(self, "_chromedriver_process", None)
+        if proc is None and getattr(self, "last_pid", None) is not None:
+            try:
+                proc = self._chromedriver_process = psutil.Process(self.last_pid)
+            except psutil.Error:
+                proc = None
+
+        if proc is not None:
+            try:
+                if proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE:
+                    return True
+            except psutil.Error:
+                pass
+            self._chromedriver_process = None  # o processo rastreado morreu
+
+        # sem pid rastreado (ou processo morto), uma única query filtrada do SO
+        # ao invés de iterar todos os PIDs em Python
+        if sys.platform != "win32":
+            return _any_image_running(frozenset({"chromedriver.exe"}))
+
+        result = run(["tasklist", "/FI", "IMAGENAME eq chromedriver.exe", "/NH", "/FO", "CSV"], capture_output=True, creationflags=CREATE_NO_WINDOW)
+        return b"chromedriver.exe" in result.stdout
 
     @classmethod
     def end_all_driver_processes(self):
-        for p in psutil.process_iter():
-            if "chrome" in p.name():
-                logger.critical(f"Encerrando processo: '{p.name()}'")
-                os.system(f"taskkill /f /t /im {p.name()}")
-
-        for p in psutil.process_iter():
-            if "chrome" in p.name():
-                return False
+        if sys.platform == "win32":
+            # taskkill /im já encerra todas as instâncias da imagem, então basta uma chamada por imagem
+            for image in CHROME_IMAGE_NAMES:
+                logger.critical(f"Encerrando processos: '{image}'")
+                run(["taskkill", "/f", "/t", "/im", image], capture_output=True, creationflags=CREATE_NO_WINDOW)
         else:
-            return True
+            for image in (name[:-4] for name in CHROME_IMAGE_NAMES):
+                logger.critical(f"Encerrando processos: '{image}'")
+                # -x casa o nome exato, sem o risco do -f pegar processos parecidos
+                run(["pkill", "-x", image], capture_output=True)
+
+        return not _any_image_running(CHROME_IMAGE_NAMES)
 
     def begin(self) -> Union[WebDriver, bool]:
         """Realiza o fluxo de criação de um driver usável
@@ -137,26 +283,30 @@ class ReusableChrome(CustomWebDriver):
             Falha ao criar o chrome
         """
 
-        # se o ID não existir...
-        if not os.path.exists(self.id_path):
-            logger.critical(f"Arquivo {self.id_path} não existe, criando um novo...")
-            with open(self.id_path, "w", encoding="utf-8") as json_file:
-                # cria um arquivo json com um dict vazio
-                json.dump(dict(), json_file, indent=4)
-            logger.critical(f"Arquivo '{self.id_path}' foi criado")
+        # segura um lock entre processos, assim duas execuções simultâneas
+        # não disputam o mesmo id.json/porta (thundering herd)
+        with _file_lock(self.id_path.with_suffix(".lock")):
+            return self.__begin()
 
-        # -----------------------------------
+    def __begin(self):
         # carrega o command executor e o session ID do arquivo id.json
-        with open(self.id_path, "r") as json_file:
-            try:
-                chrome_ids = json.load(json_file)
-            except json.decoder.JSONDecodeError:
-                chrome_ids = dict()
+        # arquivo inexistente/vazio/corrompido vira um dict vazio, sem o round-trip de criar o arquivo antes
+        chrome_ids = load_json_file(self.id_path)
 
         logger.debug(f"Arquivo de ID trouxe: '{chrome_ids}'")
 
-        self.last_session_id = chrome_ids.get("session_id", None)
-        self.last_command_executor = chrome_ids.get("command_executor", None)
+        # registro por porta: várias sessões reutilizáveis convivem no mesmo arquivo,
+        # cada instância só lê/escreve a entrada da sua porta.
+        # a chave é a porta CONFIGURADA, capturada antes do __create_new_chrome poder
+        # andar pra uma porta livre: o próximo begin() com a mesma configuração acha a
+        # entrada, e o command_executor gravado guarda a porta real pro attach
+        configured_port = str(self.port)
+        sessions = chrome_ids.get("sessions", dict())
+        session = sessions.get(configured_port, dict())
+
+        self.last_session_id = session.get("session_id", None)
+        self.last_command_executor = session.get("command_executor", None)
+        self.last_pid = session.get("pid", None)
 
         # -----------------------------------
 
@@ -168,6 +318,11 @@ class ReusableChrome(CustomWebDriver):
             if (self.last_command_executor and self.last_session_id and self.any_chrome_process_exists):
                 attached = self.__attach()
 
+            # o chromedriver pode só não ter aberto a porta ainda,
+            # espera a porta responder antes de partir pro kill + respawn
+            if not attached and self.any_chrome_process_exists and self.__wait_port_open():
+                attached = self.__attach()
+
             # se não tiver um dos três pra dar attach, então precisa reabrir o chrome
             if not attached:
                 self.end_all_driver_processes()  # encerra os chromes em execução
@@ -177,24 +332,62 @@ class ReusableChrome(CustomWebDriver):
             if attached:
                 # se conseguiu dar attach em qualquer momento, sai do loop, se não continua
                 break
+
+            # backoff exponencial com jitter pra não martelar um driver que ainda está subindo
+            time.sleep(min(0.25 * 2**tentativa_atual, 4) + random.uniform(0, 0.25))
         else:
             logger.critical(f"Não consegui criar um driver após '{self.attach_retries}' tentativas")
             return False
 
         # -----------------------------------
-        # salva as informações da nova sessão do chromedriver
+        # salva as informações da nova sessão do chromedriver na entrada da porta
+        chrome_process = getattr(self, "chrome_process", None)
         chrome_configs = {
             "command_executor": self.command_executor._url,
             "session_id": self.session_id,
+            "pid": chrome_process.pid if chrome_process is not None else self.last_pid,
         }
 
-        with open(self.id_path, "w", encoding="utf-8") as json_file:
-            json.dump(chrome_configs, json_file, indent=4)
+        sessions[configured_port] = chrome_configs
+        chrome_ids["sessions"] = sessions
+        dump_json_file(self.id_path, chrome_ids)
 
         logger.debug(f"Arquivo ID foi atualizado com: {chrome_configs}")
 
         return True
 
+    @staticmethod
+    def __port_in_use(port: int) -> bool:
+        """Tenta dar bind na porta, se falhar é porque alguém já está usando ela"""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            try:
+                sock.bind(("127.0.0.1", port))
+            except OSError:
+                return True
+        return False
+
+    def __wait_port_open(self, timeout: Union[int, float] = 2) -> bool:
+        """Espera até `timeout` segundos a porta do chromedriver aceitar conexões
+
+        Usa a porta do command_executor gravado quando existe: se o spawn anterior
+        precisou andar de porta, é nela que o chromedriver está escutando
+        """
+        port = self.port
+        if self.last_command_executor:
+            try:
+                port = int(self.last_command_executor.rsplit(":", 1)[1])
+            except ValueError:
+                pass
+
+        timer = Timer(timeout)
+        while timer.not_expired:
+            try:
+                with socket.create_connection(("127.0.0.1", port), timeout=0.1):
+                    return True
+            except OSError:
+                time.sleep(0.1)
+        return False
+
     def __create_new_chrome(self):
         """Cria um novo chrome, porém o método é um pouco diferente do convencional\n
 
@@ -204,28 +397,60 @@ class ReusableChrome(CustomWebDriver):
         """
         logger.debug("Executando um novo Chrome")
 
-        if self.new_console:
-            flag = CREATE_NEW_CONSOLE
-        else:
-            flag = CREATE_NO_WINDOW
+        # se a porta já estiver ocupada por outro processo, usa a próxima livre
+        while self.__port_in_use(self.port):
+            logger.critical(f"Porta '{self.port}' já está em uso, tentando a porta '{self.port + 1}'")
+            self.port += 1
 
-        full_launch = f'"{self.driver_path}" --port={self.port}'
+        # argv em lista evita o re-parse da linha de comando pelo CreateProcess
+        # e close_fds garante que o chromedriver não herda handles/sockets abertos do Python
+        full_launch = [self.driver_path, f"--port={self.port}"]
         logger.debug(f"Executando chrome: '{full_launch}'")
-        self.chrome_process = Popen(full_launch, creationflags=flag)
+
+        if self.new_console:
+            # no console novo os streams ficam ligados nele, pro output do chromedriver aparecer
+            self.chrome_process = Popen(full_launch, creationflags=CREATE_NEW_CONSOLE, close_fds=True)
+        else:
+            self.chrome_process = Popen(full_launch, creationflags=CREATE_NO_WINDOW, close_fds=True, stdin=DEVNULL, stdout=DEVNULL, stderr=DEVNULL)
 
         self.last_command_executor = f"http://127.0.0.1:{self.port}"
         self.last_session_id = (
             None  # reseta o session ID, assim não utiliza o do arquivo
         )
+        self.last_pid = self.chrome_process.pid
+
+        # guarda a instância psutil.Process pro any_chrome_process_exists checar o status em O(1)
+        import psutil
+        try:
+            self._chromedriver_process = psutil.Process(self.chrome_process.pid)
+        except psutil.Error:
+            self._chromedriver_process = None
         return
 
     def __attach(self):
+        # especializa os dois caminhos: sem session_id anterior (primeira execução) não existe
+        # data-dir em uso nem sessão pra trocar, então o caminho fresh pula esses passos
+        if self.last_session_id is not None:
+            return self.__attach_reuse()
+        return self.__attach_fresh()
+
+    def __attach_fresh(self):
+        """Attach em um chromedriver novo, sem sessão anterior pra reaproveitar"""
+        logger.debug("Tentando attachear a um Chrome novo...")
+
+        if not self.__driver_process_alive():
+            return False
+
+        if not self.__connect_remote():
+            return False
+
+        return self.__validate_attached()
+
+    def __attach_reuse(self):
+        """Attach reaproveitando a sessão gravada no id.json (caminho completo)"""
         logger.debug("Tentando attachear a um Chrome já existente...")
 
-        # pra dar o attach, tem que existir algum chrome aberto
-        # então procura um processo do chrome
-        if not self.any_chrome_process_exists:
-            logger.debug("Nenhum processo com nome de chrome encontrado, não vou tentar dar attach...")
+        if not self.__driver_process_alive():
             return False
 
         # --------------------  --------------------
@@ -233,7 +458,9 @@ class ReusableChrome(CustomWebDriver):
         if self.options is not None:
             # se a primeira vez que foi instanciado foi com user-data-dir,
             # na reutilização será necessário retirar esse parâmetro
-            for opt in self.options.to_capabilities()["goog:chromeOptions"]["args"]:
+            # usa a lista viva de argumentos, to_capabilities() reconstrói o dict a cada chamada
+            args = self.options.arguments
+            for i, opt in enumerate(args):
                 if "user-data-dir" in opt:
                     data_dir = opt.split("=")[1]
 
@@ -245,11 +472,35 @@ class ReusableChrome(CustomWebDriver):
                             os.rename(data_dir, data_dir)
                         except OSError:
                             # retira a opção de data-dir do self.options
-                            self.options.to_capabilities()["goog:chromeOptions"]["args"].remove(opt)
+                            del args[i]
                     break
 
         # --------------------  --------------------
 
+        if not self.__connect_remote():
+            return False
+
+        # o Remote sempre abre uma sessão nova, mesmo dando attach;
+        # fecha essa sessão descartável e assume o session_id gravado
+        self.close()
+        self.session_id = self.last_session_id
+
+        return self.__validate_attached()
+
+    def __driver_process_alive(self) -> bool:
+        """Pra dar o attach, tem que existir algum chromedriver aberto"""
+        # se o pid do chromedriver é conhecido a verificação é O(1), sem varrer a tabela de processos
+        if self.last_pid is not None:
+            import psutil
+            if not psutil.pid_exists(self.last_pid):
+                logger.debug(f"Processo '{self.last_pid}' do chromedriver não existe mais, não vou tentar dar attach...")
+                return False
+        elif not self.any_chrome_process_exists:
+            logger.debug("Nenhum processo com nome de chrome encontrado, não vou tentar dar attach...")
+            return False
+        return True
+
+    def __connect_remote(self) -> bool:
         try:
             # antigo pra referencia:
             # driver = webdriver.Remote(self.last_command_executor, options=self.options)
@@ -260,29 +511,23 @@ class ReusableChrome(CustomWebDriver):
         except SessionNotCreatedException as e:
             logger.exception(f"Geralmente o chrome está desatualizado:")
             # tira a versão que o chrome está para baixar o chromedriver dela
-            version = re.findall("version is (.*) with binary", str(e))
+            version = _VERSION_RE.search(str(e))
             if version:
-                self.driver_path = ChromeDriverManager(path=self.driver_path).install()
+                _resolve_driver.cache_clear()  # a versão do chrome mudou, o path memoizado não serve mais
+                self.driver_path = _resolve_driver(self.driver_path)
             return False
         except (MaxRetryError, WebDriverException):
             logger.exception(f"Exceção ao conectar no chrome usando Remote:")
             self.end_all_driver_processes()
             return False
 
-        # --------------------  --------------------
-
-        # se não tem session ID então o chrome que foi aberto é novo
-        # se já tinha session ID precisa fechar o driver (ele sempre abre um novo, mesmo usando remote, ele que será fechado) e mudar o ID
-        if self.last_session_id is not None:
-            self.close()
-            self.session_id = self.last_session_id
+        return True
 
-        # --------------------  --------------------
-        # validações pra verificar se o driver que foi aberto está responsivo
+    def __validate_attached(self) -> bool:
+        # validação pra verificar se o driver que foi aberto está responsivo
+        # uma única chamada remota; window_handles + switch_to eram dois round-trips HTTP
         try:
-            for handle in self.window_handles:
-                self.switch_to.window(handle)
-                break
+            self.current_window_handle
         except InvalidSessionIdException:
             logger.critical(f"Session ID '{self.last_session_id}' gravada não serve para o chrome atual")
             return False
@@ -290,14 +535,9 @@ class ReusableChrome(CustomWebDriver):
             logger.critical("Geralmente chrome not reachable")
             return False
 
-        # --------------------  --------------------
         # muda o implicity_wait do driver
         self.implicitly_wait(self.implicity_wait)
-        # se ele falhar no Remote ou no swith_to, retorna False
-        # pois não conseguiu de fato assumir o controle de um chrome
-        # return False
 
-        # --------------------  --------------------
         logger.critical("Attach com sucesso!")
         return True
 
@@ -316,8 +556,7 @@ class CreateChrome(CustomWebDriver, Chrome):
 
         if isinstance(driver_path, Path):
             driver_path = str(driver_path)
-            cache = DriverCacheManager(driver_path)
-        self.driver_path = ChromeDriverManager(cache_manager=cache).install()
+        self.driver_path = _resolve_driver(driver_path)
 
         self.implicity_wait = implicity_wait
         self.port = port
@@ -339,8 +578,6 @@ class CreateChrome(CustomWebDriver, Chrome):
 def create_chrome():
     """This is an example function that you can copy and customize for each project"""
     BASE_DIR = Path(__file__).parent.resolve()
-    logging.getLogger("selenium").setLevel(logging.WARNING)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
 
     chrome_configs = {
         "driver_path": BASE_DIR / "/chromedriver",
@@ -400,13 +637,15 @@ def create_chrome():
     for ext in chrome_options["extensions"]:
         ext = Path(ext)
         if ext.is_dir():
-            for e in ext.glob("*.*"):
-                all_extensions.append(str(e))
+            # scandir aproveita os dados do próprio directory entry, sem um stat() extra por arquivo
+            with os.scandir(ext) as it:
+                all_extensions.extend(entry.path for entry in it if entry.is_file())
         else:
             all_extensions.append(str(ext))
 
     for ext in all_extensions:
-        options.add_extension(ext)
+        # a versão pré-codificada evita reler o .crx do disco a cada driver construído
+        options.add_encoded_extension(_encode_extension(ext, os.stat(ext).st_mtime_ns))
 
     # --------------------------------------------------
 
@@ -1,7 +1,12 @@
+import asyncio
 import json
 import logging
+import random
+import threading
 import time
-from typing import Literal, Optional, Union
+from collections import deque
+from pathlib import Path
+from typing import ClassVar, Literal, Optional, Union
 
 from fake_useragent import FakeUserAgent
 from retimer import Timer
@@ -18,20 +23,239 @@ from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from ._driver_cache import resolve_driver_async
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional, sem ele usa o json da stdlib
+    orjson = None
+
 # --------------------------------------------------
 
 logger = logging.getLogger(__name__)
 
 # --------------------------------------------------
 
+# normaliza o `by` recebido (string literal ou atributo de By) pra constante canônica
+# uma vez só no call site, ao invés do dispatch por string a cada probe
+_BY_MAP = {
+    "id": By.ID,
+    "xpath": By.XPATH,
+    "link text": By.LINK_TEXT,
+    "partial link text": By.PARTIAL_LINK_TEXT,
+    "name": By.NAME,
+    "tag name": By.TAG_NAME,
+    "class name": By.CLASS_NAME,
+    "css selector": By.CSS_SELECTOR,
+}
+
+# um único round-trip: localiza o elemento e já calcula visibilidade/clicabilidade no browser,
+# ao invés de três probes seriais de expected_conditions por iteração
+_FIND_ELEMENT_SRC = """
+var by = arguments[0], selector = arguments[1];
+var el = null;
+if (by === 'xpath') {
+    el = document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+} else if (by === 'id') {
+    el = document.getElementById(selector);
+} else if (by === 'name') {
+    el = document.getElementsByName(selector)[0] || null;
+} else if (by === 'class name') {
+    el = document.getElementsByClassName(selector)[0] || null;
+} else if (by === 'tag name') {
+    el = document.getElementsByTagName(selector)[0] || null;
+} else if (by === 'link text' || by === 'partial link text') {
+    var links = document.getElementsByTagName('a');
+    for (var i = 0; i < links.length; i++) {
+        var text = links[i].textContent.trim();
+        if ((by === 'link text' && text === selector) || (by === 'partial link text' && text.indexOf(selector) !== -1)) {
+            el = links[i];
+            break;
+        }
+    }
+} else {
+    el = document.querySelector(selector);
+}
+if (!el) { return null; }
+var rect = el.getBoundingClientRect();
+var style = getComputedStyle(el);
+var visible = rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' && style.display !== 'none';
+var clickable = visible && !el.disabled;
+return [el, visible, clickable];
+"""
+
+# expressão (IIFE) pro cache de scripts compilados: lê o progresso de cada download
+# em chrome://downloads/, None = acabou, int = porcentagem
+_DOWNLOAD_PROGRESS_SRC = """
+(function () {
+    var tag = document.querySelector('downloads-manager').shadowRoot;
+    var item_tags = tag.querySelectorAll('downloads-item');
+    var item_tags_length = item_tags.length;
+    var progress_lst = [];
+    for(var i=0; i<item_tags_length; i++) {
+        var intag = item_tags[i].shadowRoot;
+        var progress_tag = intag.getElementById('progress');
+        var progress = null;
+        if(progress_tag) {
+            var progress = progress_tag.value;
+        }
+        progress_lst.push(progress);
+    }
+    return progress_lst;
+})()
+"""
+
+# injeta um input de arquivo fora da viewport que, ao receber o arquivo,
+# dispara os eventos de drag no alvo e se remove sincronamente
+_DROP_FILE_SRC = """
+    var target = arguments[0],
+        offsetX = arguments[1],
+        offsetY = arguments[2],
+        document = target.ownerDocument || document,
+        window = document.defaultView || window;
+
+    var input = document.createElement('INPUT');
+    input.type = 'file';
+    input.style.position = 'fixed';
+    input.style.left = '-9999px';
+    input.style.top = '0';
+    input.onchange = function () {
+    var rect = target.getBoundingClientRect(),
+        x = rect.left + (offsetX || (rect.width >> 1)),
+        y = rect.top + (offsetY || (rect.height >> 1)),
+        dataTransfer = { files: this.files };
+
+    ['dragenter', 'dragover', 'drop'].forEach(function (name) {
+        var evt = document.createEvent('MouseEvent');
+        evt.initMouseEvent(name, !0, !0, window, 0, 0, 0, x, y, !1, !1, !1, !1, 0, null);
+        evt.dataTransfer = dataTransfer;
+        target.dispatchEvent(evt);
+    });
+
+    // remove sincrono: o setTimeout de 25ms deixava uma janela em que
+    // scripts da página podiam mexer no input órfão
+    document.body.removeChild(input);
+    };
+    document.body.appendChild(input);
+    return input;
+"""
+
+# https://w3c.github.io/webdriver/#interface
+# constante de módulo: a string é alocada/internada uma vez só
+_NAV_UNDEFINED_SRC = """
+    Object.defineProperty(navigator, 'webdriver', {
+    get: () => undefined
+    })
+"""
+
+# --------------------------------------------------
+
 class CustomWebDriver(WebDriver):
 
-    def execute_cdp_cmd(self, cmd, params={}):
-        url = f"{self.command_executor._url}/session/{self.session_id}/chromium/send_command_and_get_result"
-        body = json.dumps({"cmd": cmd, "params": params})
-        response = self.command_executor._request("POST", url, body)
+    # singleton + pool de user agents: instanciar o FakeUserAgent relê e parseia
+    # o data file dele a cada construção, então a factory é compartilhada pela classe
+    _ua_factory: ClassVar[Optional[FakeUserAgent]] = None
+    _ua_pool: ClassVar[deque] = deque()
+
+    # teto do backoff entre tentativas (segundos)
+    _max_backoff: ClassVar[Union[int, float]] = 2
+
+    # constante de classe: a string do click é alocada uma vez só
+    _CLICK_SRC: ClassVar[str] = "arguments[0].click();"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        # reaproveita a conexão TCP entre os comandos, assim cada POST não paga um handshake novo
+        self.command_executor.keep_alive = True
+
+        # a URL do CDP só é reconstruída quando o session_id muda (o attach troca a sessão)
+        self._cdp_url = None
+        self._cdp_url_session = None
+
+        # evento compartilhado pelas esperas longas, setado por cancel_waits()
+        self._cancel = threading.Event()
+        return
+
+    def _backoff(self, attempt: int) -> None:
+        """Espera com backoff exponencial + jitter
+
+        Retries em lock-step de vários drivers martelam o endpoint do WebDriver ao mesmo tempo;
+        começa em ~50ms e dobra a cada tentativa até `_max_backoff`
+        """
+        time.sleep(min(self._max_backoff, (0.05 * 2**attempt) * (0.5 + random.random())))
+        return
+
+    def _cancel_event(self) -> threading.Event:
+        # getattr pois as subclasses reutilizáveis só rodam o __init__ daqui no attach
+        event = getattr(self, "_cancel", None)
+        if event is None:
+            event = self._cancel = threading.Event()
+        return event
+
+    def cancel_waits(self) -> None:
+        """Sinaliza as esperas longas (ex: `fill_element` aguardando readonly) a abortarem
+
+        As esperas interrompidas retornam `False` pro caller
+        """
+        self._cancel_event().set()
+        return
+
+    def execute_cdp_cmd(self, cmd, params=None):
+        params = params if params is not None else {}
+
+        # getattr pois as subclasses reutilizáveis só rodam o __init__ daqui no attach
+        if getattr(self, "_cdp_url_session", None) != self.session_id:
+            self._cdp_url = f"{self.command_executor._url}/session/{self.session_id}/chromium/send_command_and_get_result"
+            self._cdp_url_session = self.session_id
+
+        # orjson serializa ~5-10x mais rápido que a stdlib; conta nos comandos quentes
+        # (Runtime.runScript do cache compilado, setUserAgentOverride sob rotação)
+        if orjson is not None:
+            body = orjson.dumps({"cmd": cmd, "params": params}).decode()
+        else:
+            body = json.dumps({"cmd": cmd, "params": params})
+        response = self.command_executor._request("POST", self._cdp_url, body)
         return response.get("value")
 
+    def _run_compiled(self, name: str, source: str):
+        """Roda um script quente compilado uma vez por sessão
+
+        `Runtime.compileScript` devolve um scriptId persistente, então as execuções
+        seguintes só pagam o `Runtime.runScript`, sem o parse/compile do V8 a cada chamada.
+        `source` precisa ser uma expressão (ex: uma IIFE); qualquer falha no bridge CDP
+        cai de volta pro `execute_script` normal
+
+        ---
+        Parameters
+        ------
+        `name` : str
+            Chave do script no cache
+        `source` : str
+            Expressão javascript cujo resultado será retornado
+        """
+        # o cache é por sessão: o attach troca o session_id e os scriptIds antigos morrem com ela
+        if getattr(self, "_script_ids_session", None) != self.session_id:
+            self._script_ids = dict()
+            self._script_ids_session = self.session_id
+
+        try:
+            script_id = self._script_ids.get(name)
+            if script_id is None:
+                compiled = self.execute_cdp_cmd(
+                    "Runtime.compileScript",
+                    {"expression": source, "sourceURL": f"tkit://{name}.js", "persistScript": True},
+                )
+                script_id = compiled["scriptId"]
+                self._script_ids[name] = script_id
+
+            r = self.execute_cdp_cmd("Runtime.runScript", {"scriptId": script_id, "returnByValue": True})
+            return r["result"]["value"]
+        except (WebDriverException, KeyError, TypeError):
+            # é só otimização: descarta o id e roda pelo caminho padrão
+            self._script_ids.pop(name, None)
+            return self.execute_script(f"return {source}")
+
     def rotate_user_agent(self, ua: Optional[str] = None) -> bool:
         """Rotates the agent using FakeUserAgent[1]
 
@@ -43,14 +267,23 @@ class CustomWebDriver(WebDriver):
             Optional, use `None` for a random agent
         """
         if ua is None:
-            ua = FakeUserAgent().random
-        
+            if CustomWebDriver._ua_factory is None:
+                CustomWebDriver._ua_factory = FakeUserAgent()
+            if not CustomWebDriver._ua_pool:
+                # pré-gera um ring buffer de UAs, assim rotacionar vira um deque.rotate O(1)
+                CustomWebDriver._ua_pool.extend(CustomWebDriver._ua_factory.random for _ in range(64))
+            CustomWebDriver._ua_pool.rotate(-1)
+            ua = CustomWebDriver._ua_pool[0]
+
         try:
-            logger.debug(f"User agent atual: '{self.execute_script('return navigator.userAgent')}'")
-            
+            # cada leitura do navigator.userAgent é um round-trip, só paga por ela com o log em DEBUG
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"User agent atual: '{self.execute_script('return navigator.userAgent')}'")
+
             self.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": ua})
-            
-            logger.debug(f"User agent novo: '{self.execute_script('return navigator.userAgent')}'")
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"User agent novo: '{self.execute_script('return navigator.userAgent')}'")
         except WebDriverException:
             logger.exception("Exception occured while changing browser user agent")
             return False
@@ -60,23 +293,54 @@ class CustomWebDriver(WebDriver):
 
     def set_navigator_to_undefined(self) -> None:
         """https://w3c.github.io/webdriver/#interface"""
-        
-        self.execute_cdp_cmd(
-            "Page.addScriptToEvaluateOnNewDocument",
-            {
-                "source": """
-                    Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                    })
-                """
-            },
-        ) # yapf: disable
-        
+
+        self.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _NAV_UNDEFINED_SRC})
+
         return
 
+    def configure_stealth(
+        self,
+        *,
+        ua: Optional[str] = None,
+        timezone: Optional[str] = None
+        ) -> bool:  # yapf: disable
+        """Aplica os overrides de bootstrap (user agent, navigator.webdriver e timezone) de uma vez
+
+        Emitir os comandos CDP em sequência na mesma conexão amortiza o custo de cada POST,
+        ao invés de cada helper pagar seu próprio round-trip espalhado pelo código
+
+        ---
+        Parameters
+        ------
+        `ua` : str
+            Optional, use `None` for a random agent
+        `timezone` : str
+            Optional, timezone ID (ex: 'America/Sao_Paulo'), `None` não sobrescreve
+
+        Returns
+        ------
+        `True` : bool
+            Todos os overrides aplicados
+        `False` : bool
+            Alguma exception ao aplicar (ver log)
+        """
+
+        r = self.rotate_user_agent(ua)
+
+        try:
+            self.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _NAV_UNDEFINED_SRC})
+
+            if timezone is not None:
+                self.execute_cdp_cmd("Emulation.setTimezoneOverride", {"timezoneId": timezone})
+        except WebDriverException:
+            logger.exception("Exception occured while applying stealth overrides")
+            return False
+
+        return r
+
     def scroll_down(
         self, *,
-        scroll_sleep: Union[int, float] = 5,
+        scroll_sleep: Union[int, float] = 0.5,
         timeout: Union[int, float] = 30
         ) -> bool:  # yapf: disable
         """Scroll page down
@@ -85,7 +349,7 @@ class CustomWebDriver(WebDriver):
         Parameters
         ------
         `scroll_sleep` : int, float
-            Time between each scroll
+            Intervalo entre cada tick de scroll dentro do browser
         `timeout` : int, float
             Time limit to reach the botton of the page
 
@@ -97,38 +361,57 @@ class CustomWebDriver(WebDriver):
             Timeout
         """
 
-        last_height = self.execute_script("return document.body.scrollHeight")
-
-        timer = Timer(timeout)
-        while timer.not_expired:
-            try:
-                # scrolls to the page height (botton of the page)
-                self.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-
-                # wait to page loads/scrolls
-                time.sleep(scroll_sleep)
-
-                # double check for page state becomes complete
-                self.wait_page_state(timeout=scroll_sleep)
-
-                # gets the new height of the page
-                new_height = self.execute_script("return document.body.scrollHeight")
-            except WebDriverException:
-                logger.exception(f"Exception ao scrollar a página:")
-                continue
-
-            # if the height now is the same as the height before
-            # we consider that the page is not fully scrolled
-            if new_height == last_height:
-                logger.debug(f"Page height hasn't changed since last scroll. Assuming it's fully scrolled.")
-                return True
-
-            last_height = new_height
-            continue
+        # o loop inteiro roda no browser: um setInterval scrolla e monitora a altura,
+        # resolvendo o callback quando ela fica estável por 3 ticks seguidos com a página pronta.
+        # um único round-trip async no lugar de (scroll + sleep + leitura de altura) por iteração.
+        # document.scrollingElement é quem reflete a altura real do documento em standards
+        # mode (body.scrollHeight fica congelado no viewport), e innerHeight + scrollY >=
+        # scrollHeight confirma que o viewport de fato chegou no fim
+        script = (
+            "var tick = arguments[0] * 1000;"
+            "var callback = arguments[arguments.length - 1];"
+            "var scroller = document.scrollingElement || document.documentElement;"
+            "var last = scroller.scrollHeight;"
+            "var stable = 0;"
+            "var interval = setInterval(function () {"
+            "    window.scrollTo(0, scroller.scrollHeight);"
+            "    var height = scroller.scrollHeight;"
+            "    var atBottom = window.innerHeight + window.scrollY >= height;"
+            "    if (height === last && atBottom) {"
+            "        stable += 1;"
+            "    } else {"
+            "        stable = 0;"
+            "        last = height;"
+            "    }"
+            "    if (stable >= 3 && document.readyState === 'complete') {"
+            "        clearInterval(interval);"
+            "        callback(true);"
+            "    }"
+            "}, tick);"
+        )
 
-        if timer.expired:
-            logger.info(f"Timeout scrolling page after '{timer.duration}' seconds")
+        previous_script_timeout = None
+        try:
+            # guarda o timeout de sessão atual pra restaurar depois: set_script_timeout
+            # é global da sessão e vazaria pra todo execute_async_script futuro
+            previous_script_timeout = self.timeouts.script
+            self.set_script_timeout(timeout)
+            self.execute_async_script(script, scroll_sleep)
+        except TimeoutException:
+            logger.info(f"Timeout scrolling page after '{timeout}' seconds")
             return False
+        except WebDriverException:
+            logger.exception(f"Exception ao scrollar a página:")
+            return False
+        finally:
+            if previous_script_timeout is not None:
+                try:
+                    self.set_script_timeout(previous_script_timeout)
+                except WebDriverException:
+                    pass  # sessão morreu no meio, não tem timeout pra restaurar
+
+        logger.debug(f"Page height hasn't changed since last scroll. Assuming it's fully scrolled.")
+        return True
 
     def open_url(
         self,
@@ -195,26 +478,46 @@ class CustomWebDriver(WebDriver):
             Timeout
         """
 
-        timer = Timer(timeout)
-
-        while timer.not_expired:
-            try:
-                page_state = self.wait_execute_script("document.readyState", timeout=1)
-            except WebDriverException:
-                logger.exception("")
-                time.sleep(1)
-                continue
-            
-            logger.debug(f"Page state now: '{page_state}'. Desired state: '{state}'")
-            if state == state:
-                return True
-            
-            time.sleep(1)
-            continue
+        # ao invés de fazer polling com sleep, um listener de readystatechange no browser
+        # resolve o callback assim que o estado desejado é atingido.
+        # a comparação é por rank (loading < interactive < complete): o readystatechange
+        # só dispara em transições pra frente, então esperar um estado que a página já
+        # passou (ex: 'interactive' depois do load completo) resolve na hora ao invés
+        # de pendurar no timeout
+        script = (
+            "var rank = {loading: 0, interactive: 1, complete: 2};"
+            "var state = arguments[0];"
+            "var callback = arguments[arguments.length - 1];"
+            "if (rank[document.readyState] >= rank[state]) { callback(); return; }"
+            "document.addEventListener('readystatechange', function handler() {"
+            "    if (rank[document.readyState] >= rank[state]) {"
+            "        document.removeEventListener('readystatechange', handler);"
+            "        callback();"
+            "    }"
+            "});"
+        )
 
-        if timer.expired:
-            logger.debug(f"Timeout after {timer.duration} seconds")
+        previous_script_timeout = None
+        try:
+            # guarda o timeout de sessão atual pra restaurar depois: set_script_timeout
+            # é global da sessão e vazaria pra todo execute_async_script futuro
+            previous_script_timeout = self.timeouts.script
+            self.set_script_timeout(timeout)
+            self.execute_async_script(script, state)
+        except TimeoutException:
+            logger.debug(f"Timeout after {timeout} seconds waiting page state '{state}'")
             return False
+        except WebDriverException:
+            logger.exception("")
+            return False
+        finally:
+            if previous_script_timeout is not None:
+                try:
+                    self.set_script_timeout(previous_script_timeout)
+                except WebDriverException:
+                    pass  # sessão morreu no meio, não tem timeout pra restaurar
+
+        return True
 
     def wait_execute_script(
         self,
@@ -241,43 +544,37 @@ class CustomWebDriver(WebDriver):
             Couldn't execute script
         """
         
-        timer = Timer(timeout)
-        while timer.not_expired:
+        # o WebDriverWait já implementa o loop de retry com poll_frequency configurável,
+        # sem o overhead do loop Python + sleep fixo de 1s entre tentativas
+        wait = WebDriverWait(
+            self,
+            timeout,
+            poll_frequency=0.1,
+            ignored_exceptions=(JavascriptException, StaleElementReferenceException, UnexpectedAlertPresentException),
+        )
 
-            try:
-                r = self.execute_script(script)
-            except (
-                JavascriptException,
-                StaleElementReferenceException,
-                UnexpectedAlertPresentException,
-            ):
-                # These exceptions can be retried and works for most of cases
-                logger.exception("")
-                time.sleep(1)
-                continue
-            
-            except Exception:
-                logger.exception(f"Unknow exception!")
-                raise
+        def _run(driver):
+            r = driver.execute_script(script)
 
             if force_wait_webelement:
                 # if the return must be a web element, forces the loop to continue
                 if isinstance(r, WebElement):
-                    return r
-                elif isinstance(r, list): # if it's a list, check if any item is a WebElement
+                    return [r]
+                if isinstance(r, list): # if it's a list, check if any item is a WebElement
                     if any([isinstance(i, WebElement) for i in r]):
-                        return r
-                
-                time.sleep(1)
-                continue
+                        return [r]
+                return False
 
             # Some actions dont return anything, if thats the case, returns True
             # so we can at least evaluate the result
             r = True if r is None else r
-            return r
+            # embrulha numa lista pro until não descartar retornos falsy válidos (0, '', False)
+            return [r]
 
-        if timer.expired:
-            logger.debug(f"Timeout after {timer.duration} seconds")
+        try:
+            return wait.until(_run)[0]
+        except TimeoutException:
+            logger.debug(f"Timeout after {timeout} seconds")
             return False
 
     def wait_find_element(
@@ -287,7 +584,7 @@ class CustomWebDriver(WebDriver):
         selector: str,
         timeout: Union[float, int] = 30,
     ) -> Union[bool, WebElement]:  # yapf: disable
-        """Searches an webelement using `WebDriverWait` and any of these expected conditions: `element_to_be_clickable`, `visibility_of`, `presence_of_element_located`
+        """Searches an webelement with a single javascript query that also checks visibility and clickability in the browser
 
         ---
         Parameters
@@ -307,46 +604,31 @@ class CustomWebDriver(WebDriver):
             Exception ao encontrar o elemento web
         """
 
-        timer = Timer(timeout)
-        while timer.not_expired:
-            try:
-                try:
-                    clickable = WebDriverWait(self, 0.01).until(EC.element_to_be_clickable((by, selector)))
-                except (TimeoutException, WebDriverException, AttributeError):
-                    clickable = None
+        by = _BY_MAP.get(by, by)
 
-                try:
-                    visibility = WebDriverWait(self, 0.01).until(EC.visibility_of((by, selector)))
-                except (TimeoutException, WebDriverException, AttributeError):
-                    visibility = None
-
-                try:
-                    presence = WebDriverWait(self, 0.01).until(EC.presence_of_element_located((by, selector)))
-                except (TimeoutException, WebDriverException, AttributeError):
-                    presence = None
-            
-            except Exception:
-                logger.exception(f"Unknow exception occured")
-                raise
-            
-            if visibility:
-                logger.debug(f"Found element with condition: 'visibility_of'")
-                r = visibility
-            elif clickable:
-                logger.debug(f"Found element with condition: 'element_to_be_clickable'")
-                r = clickable
-            elif presence:
-                logger.debug(f"Found element with condition: 'presence_of_element_located'")
-                r = presence
-            else:
-                continue
-
-            return r
+        wait = WebDriverWait(
+            self,
+            timeout,
+            poll_frequency=0.1,
+            ignored_exceptions=(JavascriptException, StaleElementReferenceException, UnexpectedAlertPresentException, WebDriverException),
+        )
 
-        if timer.expired:
-            logger.info(f"Timeout após {timer.duration} segundos")
+        try:
+            # o probe retorna null enquanto não acha, o until cuida do polling
+            found = wait.until(lambda driver: driver.execute_script(_FIND_ELEMENT_SRC, by, selector))
+        except TimeoutException:
+            logger.info(f"Timeout após {timeout} segundos")
             return False
 
+        element, visible, clickable = found
+        if clickable:
+            logger.debug(f"Found element, it's visible and clickable")
+        elif visible:
+            logger.debug(f"Found element, it's visible")
+        else:
+            logger.debug(f"Found element")
+        return element
+
     def wait_find_elements(
         self,
         by: Union[By, Literal["id", "xpath", "link text", "partial link text",
@@ -354,7 +636,7 @@ class CustomWebDriver(WebDriver):
         selector: str,
         timeout: Union[float, int] = 30,
     ) -> Union[bool, list[WebElement]]:  # yapf: disable
-        """Procura um elemento usando `WebDriverWait` e `EC.element_to_be_clickable`
+        """Procura elementos usando `WebDriverWait` com `EC.presence_of_all_elements_located` e filtra a visibilidade via javascript
 
         ---
         Parameters
@@ -374,37 +656,42 @@ class CustomWebDriver(WebDriver):
             Ocorreu uma exception ao encontrar o elemento web
         """
 
-        timer = Timer(timeout)
-        while timer.not_expired:
-            try:
-                try:
-                    presence = WebDriverWait(self, 1).until(EC.presence_of_all_elements_located((by, selector)))
-                except (TimeoutException, WebDriverException, AttributeError):
-                    presence = None
-                    
-                try:
-                    visibility = WebDriverWait(self, 1).until(EC.visibility_of_all_elements_located((by, selector)))
-                except (TimeoutException, WebDriverException, AttributeError):
-                    visibility = None
-            
-            except Exception:
-                logger.exception(f"Unknow exception occured")
-                raise
-                
-            
+        # locator montado uma vez, o mesmo tuple é passado pro EC em todo probe
+        locator = (_BY_MAP.get(by, by), selector)
+
+        wait = WebDriverWait(
+            self,
+            timeout,
+            poll_frequency=0.1,
+            ignored_exceptions=(WebDriverException, AttributeError),
+        )
+
+        def _probe(driver):
+            # visibilidade implica presença: uma chamada de presence e o filtro de
+            # visibilidade roda em lote no browser, sem um segundo findElements inteiro
+            presence = EC.presence_of_all_elements_located(locator)(driver)
+            if not presence:
+                return False
+
+            visibility = driver.execute_script(
+                "return arguments[0].filter(function (el) {"
+                "    var rect = el.getBoundingClientRect();"
+                "    return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';"
+                "});",
+                presence,
+            )
+
             if visibility:
-                logger.debug(f"Found element with condition: 'visibility_of_all_elements_located'")
-                r = visibility
-            elif presence:
-                logger.debug(f"Found element with condition: 'presence_of_all_elements_located'")
-                r = presence
-            else:
-                continue
+                logger.debug(f"Found elements, filtered the visible ones")
+                return visibility
 
-            return r
+            logger.debug(f"Found elements with condition: 'presence_of_all_elements_located'")
+            return presence
 
-        if timer.expired:
-            logger.debug(f"Timeout após {timer.duration} segundos")
+        try:
+            return wait.until(_probe)
+        except TimeoutException:
+            logger.debug(f"Timeout após {timeout} segundos")
             return False
 
     def click_element(
@@ -435,13 +722,16 @@ class CustomWebDriver(WebDriver):
         try:
             if js_click is True:
                 # clicks using execute_script, overall seens to be the best way to reliably click
-                self.execute_script("arguments[0].click();", element)
+                self.execute_script(self._CLICK_SRC, element)
             else:
                 # clicks using ActionChains, use this if js_click didn't works
-                action = ActionChains(self)
-                action.move_to_element(element)
-                action.click(element)
-                action.perform()        
+                # a instância é cacheada: construir ActionChains a cada click realoca
+                # os dois devices de input e suas filas de ações
+                action = getattr(self, "_action_chains", None)
+                if action is None:
+                    action = self._action_chains = ActionChains(self)
+                action.reset_actions()
+                action.move_to_element(element).click(element).perform()
             return True
         
         except Exception:
@@ -512,6 +802,7 @@ class CustomWebDriver(WebDriver):
         timeout: Union[float, int] = 30,
         clear_before_fill: bool = True,
         tab_after_fill: bool = True,
+        js_fill: bool = False,
     ) -> bool:  # yapf: disable
         """Preferably uses `find_and_fill_element` for the extra validation!
 
@@ -529,6 +820,8 @@ class CustomWebDriver(WebDriver):
             Clear the field before putting the text?
         `tab_after_fill` : bool
             Press tab after filling the text?
+        `js_fill` : bool
+            Sets the value via javascript (one round-trip) instead of sending each keystroke
 
         Returns
         ------
@@ -537,20 +830,26 @@ class CustomWebDriver(WebDriver):
         `False` : bool
             Couldn't fill the element
         """
+        attempt = 0
         timer = Timer(timeout)
         while timer.not_expired:
             logger.debug("Waits element to not be read-only")
             try:
                 if element.get_attribute("readonly") is True:
                     logger.debug(f"Element was readonly, waiting")
-                    time.sleep(1)
+                    # Event.wait respeita o budget restante do timer (sem estourar o timeout em até 1s)
+                    # e sai na hora se cancel_waits() for chamado
+                    if self._cancel_event().wait(min(1.0, max(0.0, timer.duration - timer.at))):
+                        logger.debug("Espera cancelada via cancel_waits()")
+                        return False
                     continue
             except StaleElementReferenceException:
                 logger.debug("Element becomes stale")
                 return False
             except Exception:
                 logger.exception(f"Unknow exception waiting element to not be readonly")
-                time.sleep(1)
+                self._backoff(attempt)
+                attempt += 1
                 continue
 
             # Fills the element
@@ -559,14 +858,27 @@ class CustomWebDriver(WebDriver):
                 element.send_keys(Keys.NULL) # to get focus
                 if clear_before_fill:
                     element.clear() # clear with selenium functions
-                    self.execute_script("arguments[0].value = '';", element) # clear with javascript
-                    for _ in range(len(text) * 2):
-                        # press delete and backspace 2 times the size of text to be filled
-                        element.send_keys(Keys.BACKSPACE)
-                        element.send_keys(Keys.DELETE)
-
-                element.send_keys(text) # send keys to the webelement
-                
+                    # limpa via javascript e dispara input/change pros frameworks (React/Vue) perceberem
+                    # antes era um par de BACKSPACE/DELETE por caractere = 4 round-trips por caractere
+                    self.execute_script(
+                        "arguments[0].value = '';"
+                        " arguments[0].dispatchEvent(new Event('input', {bubbles: true}));"
+                        " arguments[0].dispatchEvent(new Event('change', {bubbles: true}));",
+                        element,
+                    )
+
+                if js_fill:
+                    # fast-path pra quando não precisa do realismo de teclar caractere por caractere
+                    self.execute_script(
+                        "arguments[0].value = arguments[1];"
+                        " arguments[0].dispatchEvent(new Event('input', {bubbles: true}));"
+                        " arguments[0].dispatchEvent(new Event('change', {bubbles: true}));",
+                        element,
+                        text,
+                    )
+                else:
+                    element.send_keys(text) # send keys to the webelement
+
                 if tab_after_fill:
                     element.send_keys(Keys.TAB)
                     
@@ -574,7 +886,8 @@ class CustomWebDriver(WebDriver):
 
             except Exception:
                 logger.exception(f"")
-                time.sleep(1)
+                self._backoff(attempt)
+                attempt += 1
                 continue
 
         if timer.expired:
@@ -621,32 +934,43 @@ class CustomWebDriver(WebDriver):
         """
 
         timer = Timer(timeout)
+        element = None
         while timer.not_expired:
-            
-            if kwargs.get("by") and kwargs.get("selector"):
-                element = self.wait_find_element(by=kwargs["by"], selector=kwargs["selector"], timeout=0.05)
 
-            
-            elif kwargs.get("script"):
-                element = self.wait_execute_script(script=kwargs["script"], timeout=0.05, force_wait_webelement=True)
+            # o find fica fora do caminho quente: só procura de novo se ainda não achou
+            # ou se a referência ficou stale, ao invés de refazer a busca a cada validação
+            if element is None:
+                if kwargs.get("by") and kwargs.get("selector"):
+                    element = self.wait_find_element(by=kwargs["by"], selector=kwargs["selector"], timeout=0.05)
 
-            
-            else:
-                raise KeyError("Use 'by' and 'selector' for 'wait_find_element', or 'script' for 'execute_script'")
+                elif kwargs.get("script"):
+                    element = self.wait_execute_script(script=kwargs["script"], timeout=0.05, force_wait_webelement=True)
 
-            if not isinstance(element, WebElement):
-                logger.debug(f"Couldn't find any element, trying again. '{element = }'")
-                time.sleep(0.05)
-                continue
+                else:
+                    raise KeyError("Use 'by' and 'selector' for 'wait_find_element', or 'script' for 'execute_script'")
+
+                if not isinstance(element, WebElement):
+                    logger.debug(f"Couldn't find any element, trying again. '{element = }'")
+                    element = None
+                    time.sleep(0.05)
+                    continue
 
             # --------------------------------------------------
 
             # validate text filled
-            if (element.get_attribute("value") == texto) or (element.text == texto):
+            try:
+                # um round-trip lê value e textContent, antes eram até 3 chamadas (get_attribute/.text)
+                value, text = self.execute_script("return [arguments[0].value, arguments[0].textContent]", element)
+            except StaleElementReferenceException:
+                logger.debug("Element becomes stale, searching again")
+                element = None
+                continue
+
+            if (value == texto) or (text == texto):
                 logger.debug(f"Element successfully filled with '{texto}'")
                 return True
-            
-            logger.debug(f"Element have the value: attribute='{element.get_attribute('value')}'/text='{element.text}'")
+
+            logger.debug(f"Element have the value: attribute='{value}'/text='{text}'")
 
             # fills the element
             self.fill_element(
@@ -687,31 +1011,44 @@ class CustomWebDriver(WebDriver):
             Timeout após 10s
         """
 
+        if not self._open_downloads_page(timeout=timeout):
+            return False
+
+        return self._read_download_progress()
+
+    def _open_downloads_page(self, *, timeout: Union[float, int] = 10) -> bool:
+        """Navega até chrome://downloads/ (uma página inteira de load, então navegue uma vez só)"""
         r = self.open_url("chrome://downloads/", timeout=timeout)
         if r is False:
             logger.debug(f"Não carregou a página de downloads a tempo")
             return False
+        return True
 
-        progress = self.execute_script(
-            """
-        var tag = document.querySelector('downloads-manager').shadowRoot;
-        var item_tags = tag.querySelectorAll('downloads-item');
-        var item_tags_length = item_tags.length;
-        var progress_lst = [];
-        for(var i=0; i<item_tags_length; i++) {
-            var intag = item_tags[i].shadowRoot;
-            var progress_tag = intag.getElementById('progress');
-            var progress = null;
-            if(progress_tag) {
-                var progress = progress_tag.value;
-            }
-            progress_lst.push(progress);
-        }
-        return progress_lst
+    def _read_download_progress(self) -> list:
+        """Lê o progresso de cada download, assume que chrome://downloads/ já está aberto"""
+        # query quente (roda a cada tick do wait_all_downloads_end), então vai pelo cache compilado
+        return self._run_compiled("download_progress", _DOWNLOAD_PROGRESS_SRC)
+
+    def _restore_url(self, url_before: str) -> None:
+        """Volta pra página em que o caller estava antes do chrome://downloads/
+
+        `history.back()` é uma ordem de grandeza mais barato que um `driver.get` completo;
+        o reload inteiro só acontece se o back não devolver pra URL original
         """
-        )
+        if url_before.startswith("chrome://downloads"):
+            # já estava na página de downloads, reload seria redundante
+            return
 
-        return progress
+        try:
+            self.execute_script("window.history.back();")
+            self.wait_page_state(timeout=2)
+            if self.current_url == url_before:
+                return
+        except WebDriverException:
+            logger.exception("")
+
+        self.open_url(url_before)
+        return
 
     def wait_all_downloads_end(
         self,
@@ -733,23 +1070,31 @@ class CustomWebDriver(WebDriver):
             Timeout aguardando downloads terminarem
         """
         url_before = self.current_url
+
+        # navega uma única vez; cada iteração do loop custa só o execute_script do progresso,
+        # antes era um page-load completo do chrome://downloads/ por tick
+        if not self._open_downloads_page():
+            return False
+
         timer = Timer(timeout)
         while timer.not_expired:
 
-            progress = self.get_download_all_progress()
+            progress = self._read_download_progress()
 
             # espera todos os items serem None
             all_downloads_done = all(item is None for item in progress)
             if all_downloads_done is False:  # aguarda mais 1s, downloads não terminaram
-                time.sleep(1)
+                if self._cancel_event().wait(min(1.0, max(0.0, timer.duration - timer.at))):
+                    logger.debug("Espera cancelada via cancel_waits()")
+                    return False
                 continue
             else:  # se todos forem None, retorna True
-                self.open_url(url_before)
+                self._restore_url(url_before)
                 return True
 
         if timer.expired:
             logger.debug(f"Timeout após {timer.duration} segundos")
-            self.open_url(url_before)
+            self._restore_url(url_before)
             return False
 
     def drag_and_drop_file(
@@ -762,37 +1107,97 @@ class CustomWebDriver(WebDriver):
         então irá copiar pro elemento destino
 
         [SELENIUM SEND_KEYS] -> [JS_DROP_FILE] -> [TARGET]
-        """
 
-        js_drop_file = """
-            var target = arguments[0],
-                offsetX = arguments[1],
-                offsetY = arguments[2],
-                document = target.ownerDocument || document,
-                window = document.defaultView || window;
-
-            var input = document.createElement('INPUT');
-            input.type = 'file';
-            input.onchange = function () {
-            var rect = target.getBoundingClientRect(),
-                x = rect.left + (offsetX || (rect.width >> 1)),
-                y = rect.top + (offsetY || (rect.height >> 1)),
-                dataTransfer = { files: this.files };
-
-            ['dragenter', 'dragover', 'drop'].forEach(function (name) {
-                var evt = document.createEvent('MouseEvent');
-                evt.initMouseEvent(name, !0, !0, window, 0, 0, 0, x, y, !1, !1, !1, !1, 0, null);
-                evt.dataTransfer = dataTransfer;
-                target.dispatchEvent(evt);
-            });
-
-            setTimeout(function () { document.body.removeChild(input); }, 25);
-            };
-            document.body.appendChild(input);
-            return input;
+        São dois round-trips por design: anexar um arquivo de verdade precisa do
+        send_keys (caminho confiável do WebDriver), não dá pra fazer só com javascript
         """
 
         driver: CustomWebDriver = target.parent
-        file_input: WebElement = driver.execute_script(js_drop_file, target, 0, 0)
+        file_input: WebElement = driver.execute_script(_DROP_FILE_SRC, target, 0, 0)
         file_input.send_keys(path)
         return
+
+    # --------------------------------------------------
+    # Wrappers async: cada driver continua single-session, mas várias instâncias
+    # podem compartilhar o mesmo event loop — asyncio.to_thread tira a espera
+    # (que aqui é toda I/O de rede) da thread do orquestrador
+
+    async def aopen_url(self, *args, **kwargs) -> bool:
+        """Versão async de `open_url`, roda a versão sync via `asyncio.to_thread`"""
+        return await asyncio.to_thread(self.open_url, *args, **kwargs)
+
+    async def aclick_element(self, *args, **kwargs) -> bool:
+        """Versão async de `click_element`, roda a versão sync via `asyncio.to_thread`"""
+        return await asyncio.to_thread(self.click_element, *args, **kwargs)
+
+    async def afill_element(self, *args, **kwargs) -> bool:
+        """Versão async de `fill_element`, roda a versão sync via `asyncio.to_thread`"""
+        return await asyncio.to_thread(self.fill_element, *args, **kwargs)
+
+    async def afind_and_click_element(self, *args, **kwargs) -> bool:
+        """Versão async de `find_and_click_element`, roda a versão sync via `asyncio.to_thread`"""
+        return await asyncio.to_thread(self.find_and_click_element, *args, **kwargs)
+
+    async def afind_and_fill_element(self, *args, **kwargs) -> bool:
+        """Versão async de `find_and_fill_element`, roda a versão sync via `asyncio.to_thread`"""
+        return await asyncio.to_thread(self.find_and_fill_element, *args, **kwargs)
+
+    async def arotate_user_agent(self, *args, **kwargs) -> bool:
+        """Versão async de `rotate_user_agent`, roda a versão sync via `asyncio.to_thread`"""
+        return await asyncio.to_thread(self.rotate_user_agent, *args, **kwargs)
+
+
+# --------------------------------------------------
+
+class _DriverFactory(CustomWebDriver):
+    """Base comum de `CreateEdge`/`CreateFirefox`: resolve o driver em background
+    no `__init__` e monta o Service no `begin()`
+
+    As subclasses definem `_manager_cls()` e `_service_cls()` (staticmethods que
+    fazem os imports pesados lazy). Manter uma cópia só do fluxo evita que cada
+    otimização precise ser aplicada duas vezes e acabe driftando entre os browsers.
+
+    A subclasse também precisa herdar da classe do browser (ex: `CreateEdge(_DriverFactory, Edge)`),
+    assim o `super().__init__(service=..., options=...)` chega num ctor que aceita `service`
+    """
+
+    @staticmethod
+    def _manager_cls():
+        raise NotImplementedError
+
+    @staticmethod
+    def _service_cls():
+        raise NotImplementedError
+
+    def __init__(
+        self,
+        driver_path: Union[Path, str],  # yapf: disable
+        implicity_wait: int = 0,
+        port: int = 64900,
+        options=None,
+        **kwargs,
+    ) -> None:
+
+        if isinstance(driver_path, Path):
+            driver_path = str(driver_path)
+        # o resolve roda em background; o begin() bloqueia no .result() só quando precisar
+        self._driver_future = resolve_driver_async(self._manager_cls(), driver_path)
+
+        self.implicity_wait = implicity_wait
+        self.port = port
+        self.options = options
+        return
+
+    def begin(self):
+        # TODO: quando o data-dir já está em execução, dá erro, precisa corrigr
+        # ? testar se o data-dir está em uso, se sim, criar um novo?
+        # ? ou qual ação tomar?
+
+        self.driver_path = self._driver_future.result()
+        serv = self._service_cls()(executable_path=self.driver_path, port=self.port)
+
+        super().__init__(service=serv, options=self.options)
+
+        self.implicitly_wait(self.implicity_wait)
+
+        return True
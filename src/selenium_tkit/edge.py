@@ -1,58 +1,43 @@
 import logging
-import re
-from pathlib import Path
-from typing import Optional, Union
+from typing import Optional
 
+# Edge (classe base de CreateEdge) e Options precisam existir em import-time
+from selenium.webdriver import Edge
 from selenium.webdriver.edge.options import Options as EdgeOptions
-from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
 
-from .custom_webdriver import CustomWebDriver
+from .custom_webdriver import _DriverFactory
+from .pool import BrowserPool
 
 logger = logging.getLogger(__name__)
 
+# one-time: baixa o ruído do selenium/urllib3 uma vez no import, ao invés de
+# cada create_*() repagar o lock + lookup do logging a cada chamada
+logging.getLogger("selenium").setLevel(logging.WARNING)
+logging.getLogger("urllib3").setLevel(logging.WARNING)
 
-class CreateEdge(CustomWebDriver):
 
-    def __init__(
-        self,
-        driver_path: Union[Path, str],  # yapf: disable
-        implicity_wait: int = 0,
-        port: int = 64900,
-        options: Optional[EdgeOptions] = None,
-        **kwargs,
-    ) -> None:
+class CreateEdge(_DriverFactory, Edge):
+    """Herdar de Edge garante que o `service` do begin() chega no ctor certo;
+    antes o super() caía no WebDriver remoto, que não aceita `service=`"""
 
-        if isinstance(driver_path, Path):
-            driver_path = str(driver_path)
-        self.driver_path = EdgeChromiumDriverManager(path=driver_path).install()
+    @staticmethod
+    def _manager_cls():
+        # lazy, o import do webdriver_manager é pesado e só é necessário aqui
+        from webdriver_manager.microsoft import EdgeChromiumDriverManager
+        return EdgeChromiumDriverManager
 
-        self.implicity_wait = implicity_wait
-        self.port = port
-        self.options = options
-        return
+    @staticmethod
+    def _service_cls():
+        # lazy, quem só importa o módulo não paga o custo do Service
+        from selenium.webdriver.edge.service import Service as EdgeService
+        return EdgeService
 
-    def begin(self):
-        # TODO: quando o data-dir já está em execução, dá erro, precisa corrigr
-        # ? testar se o data-dir está em uso, se sim, criar um novo?
-        # ? ou qual ação tomar?
 
-        serv = EdgeService(executable_path=self.driver_path, port=self.port)
-
-        super().__init__(service=serv, options=self.options)
-
-        self.implicitly_wait(self.implicity_wait)
-
-        return True
-
-
-def create_edge():
-    """Este é apenas uma função exemplo!"""
+def _build_edge():
+    """Constrói um CreateEdge do zero; é a factory do pool do módulo"""
     # import PythonUtils.log as log
 
     # log.create_logger(level=10)
-    logging.getLogger("selenium").setLevel(logging.WARNING)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
 
     # CustomChrome.end_all_chrome_processes()
     edge_configs = {
@@ -78,8 +63,9 @@ def create_edge():
 
         for k, v in edge_options["preferences"].items():
             if isinstance(v, str):
-                v = v.replace("\n", "")
-                v = re.sub(" +", " ", v)
+                # um passe só em C: junta o strip de newline e o collapse de espaços,
+                # sem as duas passadas de replace + regex
+                v = " ".join(v.split())
             options.add_experimental_option(k, v)
 
     logger.critical(f"{options.arguments = }")
@@ -105,3 +91,27 @@ def create_edge():
     driver._is_remote = False
 
     return driver
+
+
+# pool do módulo: create_edge() reaproveita drivers quentes ao invés de
+# pagar o start de sessão inteiro a cada chamada
+_pool: Optional[BrowserPool] = None
+
+
+def create_edge():
+    """Este é apenas uma função exemplo!
+
+    Pega um driver quente do pool do módulo (construindo via `_build_edge`
+    até o limite); devolva com `release_edge(driver)` ao invés de dar quit
+    """
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(_build_edge, max_size=2)
+    return _pool.acquire()
+
+
+def release_edge(driver) -> None:
+    """Devolve o driver limpo pro pool do `create_edge`"""
+    if _pool is not None:
+        _pool.release(driver)
+    return
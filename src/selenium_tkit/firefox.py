@@ -1,21 +1,69 @@
-import json
 import logging
-import os
-import re
+import subprocess
+import sys
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Union
 
-import psutil
+# Firefox (classe base de CreateFirefox), Options e WebDriver (anotações) precisam
+# existir em import-time; o resto dos imports pesados é lazy dentro dos métodos
+from selenium.common.exceptions import (InvalidSessionIdException,
+                                        WebDriverException)
 from selenium.webdriver import Firefox
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.remote.webdriver import WebDriver
-from webdriver_manager.firefox import GeckoDriverManager
 
-from .custom_webdriver import CustomWebDriver
+# urllib3 é dependência direta do selenium (o requests não é); o ping usa ele direto
+import urllib3
+from urllib3.exceptions import MaxRetryError
+
+from ._driver_cache import resolve_driver_async
+from ._json import dump_json_file, load_json_file
+from .custom_webdriver import CustomWebDriver, _DriverFactory
+from .pool import BrowserPool
 
 logger = logging.getLogger(__name__)
 
+# one-time: baixa o ruído do selenium/urllib3 uma vez no import, ao invés de
+# cada create_*() repagar o lock + lookup do logging a cada chamada
+logging.getLogger("selenium").setLevel(logging.WARNING)
+logging.getLogger("urllib3").setLevel(logging.WARNING)
+
+# imagens exatas dos processos do firefox, pra não matar processos parecidos por engano;
+# inclui o geckodriver, que o kill por "firefox" deixava vivo
+_FIREFOX_IMAGES = frozenset({"firefox.exe", "geckodriver.exe"})
+
+
+@lru_cache(maxsize=2)
+def _any_firefox_running(_bucket: int) -> bool:
+    """Verifica se há firefox/geckodriver vivo; `_bucket` (segundo monotônico) expira o cache"""
+    import psutil  # lazy, só este probe usa
+
+    names = _FIREFOX_IMAGES | {name[:-4] for name in _FIREFOX_IMAGES}
+    return any((p.info['name'] or "") in names for p in psutil.process_iter(['name']))
+
+
+# PoolManager compartilhado pelos pings: conexão poolada, sem refazer TCP a cada probe
+_ping_pool = None
+
+
+def _ping(command_executor: str) -> bool:
+    """Probe barato no /status do driver antes de pagar o handshake completo do attach
+
+    Com timeout de 500ms e sem retries, um driver morto responde com um connection
+    refused imediato ao invés dos segundos que o attach completo levaria pra falhar
+    """
+    global _ping_pool
+
+    if _ping_pool is None:
+        _ping_pool = urllib3.PoolManager(timeout=urllib3.Timeout(total=0.5))
+
+    try:
+        return _ping_pool.request("GET", f"{command_executor}/status", retries=False).status < 400
+    except urllib3.exceptions.HTTPError:
+        return False
+
 
 class ReusableFirefox(CustomWebDriver):
 
@@ -32,11 +80,16 @@ class ReusableFirefox(CustomWebDriver):
         new_console: bool = True,
     ):
 
+        # lazy, o import do webdriver_manager é pesado e só é necessário aqui
+        from webdriver_manager.firefox import GeckoDriverManager
+
         if isinstance(driver_path, Path):
             driver_path = str(driver_path)
-        self.driver_path = GeckoDriverManager(path=driver_path).install()
+        # o resolve roda em background; o begin() bloqueia no .result() só quando precisar
+        self._driver_future = resolve_driver_async(GeckoDriverManager, driver_path)
 
-        self.id_path = id_path
+        # normaliza uma vez; o begin() usa os métodos de Path direto, sem re-coerções
+        self.id_path = Path(id_path)
         self.implicity_wait = implicity_wait
         self.port = port
         self.options = options
@@ -46,16 +99,67 @@ class ReusableFirefox(CustomWebDriver):
 
     @classmethod
     def end_all_driver_processes(self):
-        for p in psutil.process_iter():
-            if "firefox" in p.name():
-                logger.critical(f"Encerrando processo: '{p.name()}'")
-                os.system(f"taskkill /f /t /im {p.name()}")
-
-        for p in psutil.process_iter():
-            if "firefox" in p.name():
-                return False
-        else:
-            return True
+        # enumerar PIDs em Python antes de matar era redundante: o próprio SO resolve a
+        # imagem in-kernel, então um único comando incondicional derruba tudo; o exit
+        # code do kill já diz se sobrou algo, sem precisar de um walk de verificação
+        logger.critical(f"Encerrando processos do firefox")
+        ok = True
+        if sys.platform == "win32":
+            for image in _FIREFOX_IMAGES:
+                rc = subprocess.run(["taskkill", "/F", "/T", "/IM", image], capture_output=True).returncode
+                # 128 = nenhum processo com essa imagem, o que também é sucesso
+                ok = ok and rc in (0, 128)
+            return ok
+
+        for image in (name[:-4] for name in _FIREFOX_IMAGES):
+            # -x casa o nome exato, sem o risco do -f pegar processos parecidos
+            rc = subprocess.run(["pkill", "-x", image], capture_output=True).returncode
+            # 1 = nenhum processo casou com o nome
+            ok = ok and rc in (0, 1)
+        return ok
+
+    @property
+    def any_firefox_process_exists(self) -> bool:
+        """Existe algum processo do firefox/geckodriver em execução?
+
+        O loop de attach consulta isso a cada tentativa; o cache por bucket de segundo
+        garante no máximo um walk da tabela de processos por segundo
+        """
+        return _any_firefox_running(int(time.monotonic()))
+
+    def _attach(self) -> bool:
+        """Attach reaproveitando a sessão gravada no id.json
+
+        O Remote sempre abre uma sessão nova, mesmo dando attach; fecha essa
+        sessão descartável e assume o session_id gravado
+        """
+        logger.debug("Tentando attachear a um Firefox já existente...")
+
+        try:
+            # o super desta classe é o Remote
+            super().__init__(command_executor=self.last_command_executor, options=self.options)
+        except (MaxRetryError, WebDriverException):
+            logger.exception(f"Exceção ao conectar no firefox usando Remote:")
+            return False
+
+        self.close()
+        self.session_id = self.last_session_id
+
+        # validação pra verificar se o driver que foi attacheado está responsivo
+        try:
+            self.current_window_handle
+        except InvalidSessionIdException:
+            logger.critical(f"Session ID '{self.last_session_id}' gravada não serve para o firefox atual")
+            return False
+        except WebDriverException:
+            logger.critical("Geralmente firefox not reachable")
+            return False
+
+        # muda o implicity_wait do driver
+        self.implicitly_wait(self.implicity_wait)
+
+        logger.critical("Attach com sucesso!")
+        return True
 
     def begin(self) -> Union[WebDriver, bool]:
         """Realiza o fluxo de criação de um driver usável
@@ -73,21 +177,13 @@ class ReusableFirefox(CustomWebDriver):
             Falha ao criar o chrome
         """
 
-        # se o ID não existir...
-        if not os.path.exists(self.id_path):
-            logger.critical(f"Arquivo {self.id_path} não existe, criando um novo...")
-            with open(self.id_path, "w", encoding="utf-8") as json_file:
-                # cria um arquivo json com um dict vazio
-                json.dump(dict(), json_file, indent=4)
-            logger.critical(f"Arquivo '{self.id_path}' foi criado")
+        self.driver_path = self._driver_future.result()
 
         # -----------------------------------
-        # carrega o command executor e o session ID do arquivo id.json
-        with open(self.id_path, "r") as json_file:
-            try:
-                chrome_ids = json.load(json_file)
-            except json.decoder.JSONDecodeError:
-                chrome_ids = dict()
+        # carrega o command executor e o session ID do arquivo id.json numa leitura única;
+        # arquivo ausente/vazio/corrompido vira um dict vazio e o write no final cria o arquivo.
+        # o helper usa orjson quando instalado (extra 'orjson'), com fallback pra stdlib
+        chrome_ids = load_json_file(self.id_path)
 
         logger.debug(f"Arquivo de ID trouxe: '{chrome_ids}'")
 
@@ -100,9 +196,11 @@ class ReusableFirefox(CustomWebDriver):
             logger.critical(f"Tentando criar driver {tentativa_atual+1}/{self.attach_retries}")
             attached = False
 
-            # se tiver command_executor, session_id e um chrome existir, tenta usar uma sessão já aberta
-            if (self.last_command_executor and self.last_session_id and self.any_chrome_process_exists):
-                attached = self._attach()
+            # se tiver command_executor, session_id e um firefox existir, tenta usar uma sessão já aberta
+            if (self.last_command_executor and self.last_session_id and self.any_firefox_process_exists):
+                # probe barato primeiro: se o remote estiver morto nem tenta o attach completo
+                if _ping(self.last_command_executor):
+                    attached = self._attach()
 
             # se não tiver um dos três pra dar attach, então precisa reabrir o chrome
             if not attached:
@@ -122,57 +220,75 @@ class ReusableFirefox(CustomWebDriver):
             "session_id": self.session_id,
         }
 
-        with open(self.id_path, "w", encoding="utf-8") as json_file:
-            json.dump(chrome_configs, json_file, indent=4)
+        # escrita atômica (temp + os.replace): um crash no meio do dump não corrompe o id.json
+        dump_json_file(self.id_path, chrome_configs)
 
         logger.debug(f"Arquivo ID foi atualizado com: {chrome_configs}")
 
         return True
 
 
-class CreateFirefox(CustomWebDriver, Firefox):
-
-    def __init__(
-        self,
-        driver_path: Union[Path,
-                           str],
-        implicity_wait: int = 0,
-        port: int = 64900,
-        options: Optional[FirefoxOptions] = None,
-        **kwargs,
-    ) -> None:
+class CreateFirefox(_DriverFactory, Firefox):
 
-        if isinstance(driver_path, Path):
-            driver_path = str(driver_path)
-        self.driver_path = GeckoDriverManager(path=driver_path).install()
+    @staticmethod
+    def _manager_cls():
+        # lazy, o import do webdriver_manager é pesado e só é necessário aqui
+        from webdriver_manager.firefox import GeckoDriverManager
+        return GeckoDriverManager
 
-        self.implicity_wait = implicity_wait
-        self.port = port
-        self.options = options
-        return
+    @staticmethod
+    def _service_cls():
+        # lazy, quem só importa o módulo não paga o custo do Service
+        from selenium.webdriver.firefox.service import Service as FirefoxService
+        return FirefoxService
 
     def begin(self):
-        # TODO: quando o data-dir já está em execução, dá erro, precisa corrigr
-        # ? testar se o data-dir está em uso, se sim, criar um novo?
-        # ? ou qual ação tomar?
+        r = super().begin()
 
-        #  options=self.options
+        # guarda o pid do geckodriver pra permitir o encerramento direcionado depois
+        self._driver_pid = self.service.process.pid
 
-        Firefox.__init__(self, service=FirefoxService(self.driver_path), options=self.options)
+        return r
 
-        # super().__init__()
-        self.implicitly_wait(self.implicity_wait)
+    def end_driver_process(self) -> bool:
+        """Encerra só o geckodriver desta instância via terminate direcionado
 
-        return True
+        Mandar o sinal pro pid é O(1) e deixa o browser fazer o próprio shutdown
+        ordenado; o taskkill /t (que enumera a árvore de processos inteira) fica
+        como fallback pra quando o processo sobrevive ao terminate
+
+        Returns
+        ------
+        `True` : bool
+            Processo encerrado (ou já não existia)
+        `False` : bool
+            Nem o fallback conseguiu encerrar tudo
+        """
+        import psutil  # lazy, só o teardown usa
+
+        pid = getattr(self, "_driver_pid", None)
+        if pid is None:
+            logger.debug("Sem pid de driver guardado, nada pra encerrar")
+            return True
 
+        try:
+            proc = psutil.Process(pid)
+            proc.terminate()
+            proc.wait(timeout=2)
+            return True
+        except psutil.NoSuchProcess:
+            return True
+        except (psutil.Error, OSError):
+            logger.exception(f"Terminate direcionado falhou pro pid {pid}, caindo pro taskkill")
 
-def create_firefox():
-    """Este é apenas uma função exemplo!"""
+        return ReusableFirefox.end_all_driver_processes()
+
+
+def _build_firefox():
+    """Constrói um CreateFirefox do zero; é a factory do pool do módulo"""
     # import log
 
     # log.create_logger(level=10)
-    logging.getLogger("selenium").setLevel(logging.WARNING)
-    logging.getLogger("urllib3").setLevel(logging.WARNING)
 
     # CustomChrome.end_all_chrome_processes()
     firefox_configs = {
@@ -247,11 +363,15 @@ def create_firefox():
 
     # --------------------------------------------------
 
-    for k, v in firefox_options["preferences"].items():
-        if isinstance(v, str):
-            v = v.replace("\n", "")
-            v = re.sub(" +", " ", v)
-        options.set_preference(k, v)
+    # normaliza tudo numa comprehension e aplica em lote: um dict.update só no lugar
+    # de N chamadas de set_preference mutando as capabilities uma a uma
+    prefs = {k: (" ".join(v.split()) if isinstance(v, str) else v) for k, v in firefox_options["preferences"].items()}
+
+    if hasattr(options, "_preferences"):
+        options._preferences.update(prefs)
+    else:  # fallback caso o selenium mude o atributo interno
+        for k, v in prefs.items():
+            options.set_preference(k, v)
 
     # --------------------------------------------------
 
@@ -273,3 +393,27 @@ def create_firefox():
     driver._is_remote = False
 
     return driver
+
+
+# pool do módulo: create_firefox() reaproveita drivers quentes ao invés de
+# pagar o start de sessão inteiro a cada chamada
+_pool: Optional[BrowserPool] = None
+
+
+def create_firefox():
+    """Este é apenas uma função exemplo!
+
+    Pega um driver quente do pool do módulo (construindo via `_build_firefox`
+    até o limite); devolva com `release_firefox(driver)` ao invés de dar quit
+    """
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool(_build_firefox, max_size=2)
+    return _pool.acquire()
+
+
+def release_firefox(driver) -> None:
+    """Devolve o driver limpo pro pool do `create_firefox`"""
+    if _pool is not None:
+        _pool.release(driver)
+    return
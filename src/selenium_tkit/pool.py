@@ -0,0 +1,141 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# --------------------------------------------------
+
+class BrowserPool:
+    """Mantém até `max_size` drivers quentes e os empresta via `acquire()`/`release()`
+
+    Cada sessão nova do Selenium paga o fork do processo + handshake inteiro;
+    devolver o driver limpo pro pool (cookies apagados + about:blank) reaproveita
+    o processo, os caches de JS e a conexão com o driver entre os usos
+    ---
+    Parameters
+    ------
+    `factory` : Callable
+        Callable sem argumentos que retorna um driver já com `begin()` chamado
+        (ex: `create_edge`, `create_firefox`), ou algo falsy em caso de falha
+    `max_size` : int
+        Quantos drivers o pool constrói no máximo
+    """
+
+    _global: Optional["BrowserPool"] = None
+    _global_lock = threading.Lock()
+
+    def __init__(self, factory: Callable, max_size: int = 2) -> None:
+        self.factory = factory
+        self.max_size = max_size
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        return
+
+    @classmethod
+    def global_instance(cls, factory: Optional[Callable] = None, max_size: int = 2) -> "BrowserPool":
+        """Pool compartilhado pelo processo; a `factory` só é necessária na primeira chamada"""
+        with cls._global_lock:
+            if cls._global is None:
+                if factory is None:
+                    raise ValueError("Informe a 'factory' na primeira chamada de global_instance()")
+                cls._global = cls(factory, max_size)
+        return cls._global
+
+    def acquire(self, timeout: Optional[float] = 30):
+        """Pega um driver quente do pool, construindo um novo (até `max_size`) se não houver ocioso
+
+        ---
+        Parameters
+        ------
+        `timeout` : float, None
+            Com o pool cheio, quanto tempo esperar alguém devolver um driver;
+            o default finito garante que o caminho de `False` existe de verdade
+            (`None` espera pra sempre e pode deadlockar se ninguém devolver)
+
+        Returns
+        ------
+        `driver` : CustomWebDriver
+            Driver pronto pra uso
+        `False` : bool
+            A factory falhou em criar um driver novo, ou o pool está cheio
+            e ninguém devolveu um driver dentro do `timeout`
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            build_new = self._created < self.max_size
+            if build_new:
+                self._created += 1
+
+        if build_new:
+            try:
+                driver = self.factory()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+            if not driver:
+                logger.critical("Factory do pool não conseguiu criar um driver")
+                with self._lock:
+                    self._created -= 1
+                return False
+
+            return driver
+
+        # pool cheio: espera alguém devolver
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            logger.critical(f"Nenhum driver devolvido ao pool em '{timeout}' segundos")
+            return False
+
+    def release(self, driver) -> None:
+        """Limpa o driver (cookies + about:blank) e devolve pro pool, ao invés de dar quit"""
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except Exception:
+            logger.exception("Driver não pôde ser limpo, descartando do pool")
+            with self._lock:
+                self._created -= 1
+            try:
+                driver.quit()
+            except Exception:
+                logger.exception("")
+            return
+
+        self._idle.put(driver)
+        return
+
+    @contextmanager
+    def borrow(self, timeout: Optional[float] = 30):
+        """Context manager: `with pool.borrow() as driver: ...` devolve o driver sozinho"""
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            if driver:
+                self.release(driver)
+
+    def close(self) -> None:
+        """Encerra todos os drivers ociosos do pool"""
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+            try:
+                driver.quit()
+            except Exception:
+                logger.exception("")
+        return
@@ -13,15 +13,35 @@ BASE_DIR = Path(__file__).parent.resolve()
 WEBDRIVER_PATH = BASE_DIR / "webdriver"
 ID_PATH = BASE_DIR / "id.json"
 
-def teardown():
+def _clean_state(*, remove_webdriver: bool = False):
+    """Encerra os chromes e apaga o id.json
+
+    O webdriver baixado fica no lugar por padrão: apagar a pasta forçaria o
+    webdriver_manager a baixar o chromedriver de novo (segundos de HTTP + disco)
+    a cada teste, anulando o cache
+    """
     ReusableChrome.end_all_driver_processes()
     if ID_PATH.exists():
         ID_PATH.unlink()
-        
-    if WEBDRIVER_PATH.exists():
+
+    if remove_webdriver and WEBDRIVER_PATH.exists():
         shutil.rmtree(str(WEBDRIVER_PATH))
-        
-    
+
+
+@pytest.fixture(scope="session", autouse=True)
+def browser_env():
+    """Limpeza completa uma vez no começo da sessão e encerramento no final"""
+    _clean_state(remove_webdriver=True)
+    yield
+    _clean_state()
+
+
+@pytest.fixture()
+def clean_state():
+    """Opt-in pros testes que precisam começar sem sessão/id.json anterior"""
+    _clean_state()
+    return
+
 
 logging.getLogger("selenium").setLevel(logging.WARNING)
 logging.getLogger("urllib3").setLevel(logging.WARNING)
@@ -33,8 +53,8 @@ if sys.platform == "win32":
 
 class TestDisposable:
     
+    @pytest.mark.usefixtures("clean_state")
     def test_basic_create(self):
-        teardown()
         chrome = CreateChrome(WEBDRIVER_PATH)
         chrome.begin()
         chrome.open_url("https://www.google.com/")
@@ -44,8 +64,8 @@ class TestDisposable:
 
 class TestReusable:
     
+    @pytest.mark.usefixtures("clean_state")
     def test_create_wo_patch(self):
-        teardown()
         chrome = ReusableChrome(WEBDRIVER_PATH, ID_PATH, apply_patch=False)
         ret = chrome.begin()
         assert ret is True
@@ -62,8 +82,8 @@ class TestReusable:
         assert ret is True
         assert chrome.end_all_driver_processes() is True
         
+    @pytest.mark.usefixtures("clean_state")
     def test_create(self):
-        teardown()
         chrome = ReusableChrome(WEBDRIVER_PATH, ID_PATH)
         ret = chrome.begin()
         assert ret is True
@@ -0,0 +1,77 @@
+from src.selenium_tkit.pool import BrowserPool
+
+
+class StubDriver:
+    """Driver mínimo com a superfície que o pool usa (limpeza + quit)"""
+
+    def __init__(self, fail_clean: bool = False):
+        self.fail_clean = fail_clean
+        self.quit_called = False
+
+    def delete_all_cookies(self):
+        if self.fail_clean:
+            raise RuntimeError("sessão morreu")
+
+    def get(self, url):
+        return
+
+    def quit(self):
+        self.quit_called = True
+
+
+class TestBrowserPool:
+
+    def test_acquire_builds_until_max_size(self):
+        built = []
+
+        def factory():
+            driver = StubDriver()
+            built.append(driver)
+            return driver
+
+        pool = BrowserPool(factory, max_size=2)
+        first = pool.acquire()
+        second = pool.acquire()
+        assert built == [first, second]
+
+    def test_release_recycles_driver(self):
+        pool = BrowserPool(StubDriver, max_size=1)
+        driver = pool.acquire()
+        pool.release(driver)
+        assert pool.acquire() is driver
+
+    def test_acquire_returns_false_when_factory_fails(self):
+        pool = BrowserPool(lambda: False, max_size=1)
+        assert pool.acquire() is False
+
+        # o slot é devolvido: uma factory que volta a funcionar pode usá-lo
+        pool.factory = StubDriver
+        assert isinstance(pool.acquire(), StubDriver)
+
+    def test_acquire_full_pool_times_out_with_false(self):
+        pool = BrowserPool(StubDriver, max_size=1)
+        pool.acquire()  # ocupa o único slot
+        assert pool.acquire(timeout=0.05) is False
+
+    def test_release_discards_driver_that_fails_cleaning(self):
+        pool = BrowserPool(lambda: StubDriver(fail_clean=True), max_size=1)
+        driver = pool.acquire()
+        pool.release(driver)
+        assert driver.quit_called is True
+
+        # o slot liberado permite construir um substituto
+        replacement = pool.acquire(timeout=0.05)
+        assert replacement is not driver
+
+    def test_borrow_releases_on_exit(self):
+        pool = BrowserPool(StubDriver, max_size=1)
+        with pool.borrow() as driver:
+            pass
+        assert pool.acquire() is driver
+
+    def test_close_quits_idle_drivers(self):
+        pool = BrowserPool(StubDriver, max_size=1)
+        driver = pool.acquire()
+        pool.release(driver)
+        pool.close()
+        assert driver.quit_called is True